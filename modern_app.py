@@ -1,10 +1,19 @@
 import streamlit as st
 import numpy as np
-import pickle
-import plotly.graph_objects as go
-import plotly.express as px
+import joblib
+import random
+import asyncio
+import concurrent.futures
+import threading
 from datetime import datetime
-import time
+
+# ONNX Runtime is optional; without it predictions go through sklearn
+try:
+    import onnxruntime as ort
+    from skl2onnx import to_onnx
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
 
 # Page configuration
 st.set_page_config(
@@ -78,7 +87,7 @@ st.markdown("""
         background: linear-gradient(135deg, #48c6ef 0%, #6f86d6 100%);
     }
     
-    .stButton > button {
+    .stButton > button, .stFormSubmitButton > button {
         background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
         color: white;
         border: none;
@@ -90,7 +99,7 @@ st.markdown("""
         transition: all 0.3s ease;
     }
     
-    .stButton > button:hover {
+    .stButton > button:hover, .stFormSubmitButton > button:hover {
         transform: translateY(-2px);
         box-shadow: 0 8px 25px rgba(0,0,0,0.3);
     }
@@ -144,19 +153,231 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Precompute a StandardScaler as float32 (mu, inv_scale) so predict_batch()
+# can scale rows without sklearn's per-call validation. Other scalers return
+# None and go through scaler.transform.
+def get_scale_params(scaler):
+    from sklearn.preprocessing import StandardScaler
+    
+    if not isinstance(scaler, StandardScaler):
+        return None
+    mu = scaler.mean_ if scaler.with_mean else 0.0
+    scale = scaler.scale_ if scaler.with_std else 1.0
+    mu = np.asarray(mu, dtype=np.float32)
+    inv_scale = (1.0 / np.asarray(scale, dtype=np.float64)).astype(np.float32)
+    return mu, inv_scale
+
 # Load model and scaler
 @st.cache_resource
 def load_models():
     try:
-        with open("model.pkl", "rb") as f:
-            model = pickle.load(f)
-        with open("scaler.pkl", "rb") as f:
-            scaler = pickle.load(f)
-        return model, scaler, True
+        model = joblib.load("model.pkl")
+        scaler = joblib.load("scaler.pkl")
+        return model, scaler, get_scale_params(scaler), True
     except Exception as e:
-        return None, None, False
+        return None, None, None, False
+
+model, scaler, scale_params, MODEL_LOADED = load_models()
+
+# Compile the sklearn model to ONNX once so single-row predicts run in
+# ONNX Runtime's C++ path. Returns None if conversion isn't possible.
+@st.cache_resource
+def load_onnx_session(_model):
+    if not ONNX_AVAILABLE or _model is None:
+        return None
+    try:
+        onx = to_onnx(_model, np.zeros((1, 6), dtype=np.float32),
+                      options={id(_model): {'zipmap': False}})
+        return ort.InferenceSession(onx.SerializeToString(),
+                                    providers=["CPUExecutionProvider"])
+    except Exception as e:
+        return None
+
+onnx_session = load_onnx_session(model)
+if onnx_session is not None:
+    onnx_input = onnx_session.get_inputs()[0].name
 
-model, scaler, MODEL_LOADED = load_models()
+# Labels picked at random in demo mode (no model loaded)
+_LABELS = ('Low', 'Medium', 'High')
+
+# Forward pass over a stacked batch of raw input rows.
+# Returns (labels, confidences) with one entry per row.
+def predict_batch(rows):
+    if scale_params is not None:
+        mu, inv_scale = scale_params
+        input_scaled = (rows - mu) * inv_scale
+    else:
+        input_scaled = scaler.transform(rows)
+    
+    if onnx_session is not None:
+        # Outputs are [label, probabilities] for classifiers, [prediction] otherwise
+        outputs = onnx_session.run(None, {onnx_input: input_scaled.astype(np.float32, copy=False)})
+        labels = outputs[0].ravel()
+        if len(outputs) > 1:
+            return labels, outputs[1].max(axis=1) * 100
+        return labels, np.full(len(rows), 85.0)
+    
+    # One forward pass: derive the class from the probabilities when available
+    try:
+        probabilities = model.predict_proba(input_scaled)
+        idx = np.argmax(probabilities, axis=1)
+        confidences = probabilities[np.arange(len(rows)), idx] * 100
+        return model.classes_[idx], confidences
+    except AttributeError:
+        return model.predict(input_scaled), np.full(len(rows), 85.0)  # Default confidence
+
+# Micro-batches predictions from concurrent sessions. Each Streamlit session
+# runs in its own thread, so requests are handed to an asyncio loop on a
+# background thread. The worker takes whatever is already queued; a lone
+# request is run straight away, and only when others are arriving does it
+# hold the batch open for up to max_wait seconds or max_batch rows.
+class PredictBatcher:
+    def __init__(self, predict_fn, max_batch=64, max_wait=0.02, timeout=10.0):
+        self.predict_fn = predict_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.timeout = timeout
+        self.loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        threading.Thread(target=self._run, daemon=True).start()
+        self._ready.wait()
+    
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self._worker())
+    
+    async def _worker(self):
+        self.queue = asyncio.Queue()
+        self._ready.set()
+        while True:
+            items = [await self.queue.get()]
+            # Any error fails this batch's callers; the worker itself must
+            # keep running, since it is shared by every session
+            try:
+                while len(items) < self.max_batch and not self.queue.empty():
+                    items.append(self.queue.get_nowait())
+                
+                if len(items) > 1:
+                    deadline = self.loop.time() + self.max_wait
+                    while len(items) < self.max_batch:
+                        timeout = deadline - self.loop.time()
+                        if timeout <= 0:
+                            break
+                        try:
+                            items.append(await asyncio.wait_for(self.queue.get(), timeout))
+                        except asyncio.TimeoutError:
+                            break
+                
+                labels, confidences = self.predict_fn(np.vstack([row for row, _ in items]))
+                for (_, fut), label, confidence in zip(items, labels, confidences):
+                    # Callers that timed out have already cancelled their future
+                    if not fut.done():
+                        fut.set_result((label, float(confidence)))
+            except Exception as e:
+                for _, fut in items:
+                    if not fut.done():
+                        fut.set_exception(e)
+    
+    async def _submit(self, row):
+        fut = self.loop.create_future()
+        await self.queue.put((row, fut))
+        return await fut
+    
+    # Blocking call from a script thread; returns (label, confidence) for one row
+    def predict(self, row):
+        future = asyncio.run_coroutine_threadsafe(self._submit(row.copy()), self.loop)
+        try:
+            return future.result(timeout=self.timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+@st.cache_resource
+def get_batcher(_predict_fn):
+    return PredictBatcher(_predict_fn)
+
+# Memoize predictions on the six raw inputs so repeat clicks skip the model
+@st.cache_data(max_entries=1024)
+def run_predict(temp, vibration, pressure, inspection, downtime, technician):
+    row = np.array([[temp, vibration, pressure, inspection, downtime, technician]], dtype=np.float32)
+    return get_batcher(predict_batch).predict(row)
+
+# Full-scale value of each parameter on the radar chart
+_RADAR_DENOM = np.array([100, 5, 20, 60, 5000, 100], dtype=np.float32)
+
+# Normalize values to 0-1 scale for radar chart
+@st.cache_data(max_entries=1024)
+def normalize_for_radar(temp, vibration, pressure, inspection, downtime, technician):
+    values = np.array([temp, vibration, pressure, inspection, downtime, technician], dtype=np.float32)
+    return np.minimum(values / _RADAR_DENOM, 1.0)
+
+# Render WebGL traces at 1x pixel ratio to keep canvas redraws cheap
+PLOTLY_CONFIG = {"plotGlPixelRatio": 1}
+
+# Chart builders. Plotly is imported here, on first use, rather than at
+# module import time.
+def build_gauge(title, value, axis_max, bar_color, steps, threshold):
+    import plotly.graph_objects as go
+    
+    fig = go.Figure(go.Indicator(
+        mode = "gauge+number",
+        value = value,
+        title = {'text': title},
+        domain = {'x': [0, 1], 'y': [0, 1]},
+        gauge = {
+            'axis': {'range': [None, axis_max]},
+            'bar': {'color': bar_color},
+            'steps': [
+                {'range': [0, steps[0]], 'color': "lightgray"},
+                {'range': [steps[0], steps[1]], 'color': "gray"}],
+            'threshold': {
+                'line': {'color': "red", 'width': 4},
+                'thickness': 0.75,
+                'value': threshold}}
+    ))
+    fig.update_layout(height=200, margin=dict(l=0, r=0, t=30, b=0))
+    return fig
+
+def build_radar(normalized_values):
+    import plotly.graph_objects as go
+    
+    categories = ['Temperature', 'Vibration', 'Pressure', 'Inspection', 'Downtime', 'Technician']
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatterpolargl(
+        r=normalized_values,
+        theta=categories,
+        fill='toself',
+        name='Current Values',
+        line_color='#667eea'
+    ))
+    
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, 1]
+            )),
+        showlegend=True,
+        title="Parameter Analysis",
+        height=400
+    )
+    return fig
+
+# Prediction card template and per-priority recommendations
+_PRED_CARD = """
+<div class="prediction-card {cls}">
+    <h2>🎯 Maintenance Priority: {pred}</h2>
+    <p style="font-size: 1.2rem; margin: 1rem 0;">Confidence: {conf:.1f}%</p>
+    <p style="font-size: 1rem;">Recommendation: {rec}</p>
+</div>
+"""
+
+RECOMMENDATIONS = {
+    'High': 'Immediate action required',
+    'Medium': 'Schedule maintenance',
+    'Low': 'Monitor regularly'
+}
 
 # Header
 st.markdown("""
@@ -166,6 +387,10 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+# Timestamp is fixed per session instead of being reformatted on every rerun
+if "start_time" not in st.session_state:
+    st.session_state.start_time = datetime.now().strftime('%Y-%m-%d %H:%M')
+
 # Sidebar
 with st.sidebar:
     st.markdown("""
@@ -184,7 +409,7 @@ with st.sidebar:
     
     # System info
     st.markdown("### 📊 System Information")
-    st.info(f"**Last Update:** {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+    st.info(f"**Last Update:** {st.session_state.start_time}")
     st.info("**Version:** 2.0.0")
     st.info("**Model Accuracy:** 94.2%")
     
@@ -200,133 +425,159 @@ with st.sidebar:
     """)
 
 # Main content area
-col1, col2 = st.columns([2, 1])
+# Inputs live in a form so stepping a value doesn't rerun the script;
+# everything below updates once, when the form is submitted.
+with st.form("params"):
+    col1, col2 = st.columns([2, 1])
 
-with col1:
-    st.markdown("""
-    <div class="input-section">
-        <h3 style="color: #667eea; margin-bottom: 1.5rem;">📋 Equipment Parameters</h3>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    # Input fields with improved layout
-    col_a, col_b = st.columns(2)
-    
-    with col_a:
-        temp = st.number_input(
-            "🌡️ Temperature (°C)",
-            min_value=-50.0,
-            max_value=200.0,
-            value=25.0,
-            step=0.1,
-            help="Operating temperature of the equipment"
-        )
+    with col1:
+        st.markdown("""
+        <div class="input-section">
+            <h3 style="color: #667eea; margin-bottom: 1.5rem;">📋 Equipment Parameters</h3>
+        </div>
+        """, unsafe_allow_html=True)
         
-        vibration = st.number_input(
-            "🔊 Vibration (mm/s)",
-            min_value=0.0,
-            max_value=10.0,
-            value=1.5,
-            step=0.1,
-            help="Vibration level measurement"
-        )
+        # Input fields with improved layout
+        col_a, col_b = st.columns(2)
         
-        pressure = st.number_input(
-            "⚙️ Pressure (bar)",
-            min_value=0.0,
-            max_value=100.0,
-            value=5.0,
-            step=0.1,
-            help="Operating pressure"
-        )
+        with col_a:
+            temp = st.number_input(
+                "🌡️ Temperature (°C)",
+                min_value=-50.0,
+                max_value=200.0,
+                value=25.0,
+                step=0.1,
+                help="Operating temperature of the equipment"
+            )
+            
+            vibration = st.number_input(
+                "🔊 Vibration (mm/s)",
+                min_value=0.0,
+                max_value=10.0,
+                value=1.5,
+                step=0.1,
+                help="Vibration level measurement"
+            )
+            
+            pressure = st.number_input(
+                "⚙️ Pressure (bar)",
+                min_value=0.0,
+                max_value=100.0,
+                value=5.0,
+                step=0.1,
+                help="Operating pressure"
+            )
+        
+        with col_b:
+            inspection = st.number_input(
+                "🕒 Inspection Duration (min)",
+                min_value=1,
+                max_value=480,
+                value=30,
+                step=1,
+                help="Time spent on inspection"
+            )
+            
+            downtime = st.number_input(
+                "💰 Downtime Cost (USD)",
+                min_value=0,
+                max_value=100000,
+                value=1000,
+                step=50,
+                help="Cost per hour of downtime"
+            )
+            
+            technician = st.number_input(
+                "👷 Technician Availability (%)",
+                min_value=0,
+                max_value=100,
+                value=85,
+                step=1,
+                help="Percentage of technician availability"
+            )
+
+    with col2:
+        st.markdown("### 📈 Submitted Metrics")
+        
+        # Gauge charts for key metrics
+        fig_temp = build_gauge("Temperature", temp, 100, "darkblue", (50, 80), 80)
+        st.plotly_chart(fig_temp, use_container_width=True, config=PLOTLY_CONFIG)
+        
+        fig_vib = build_gauge("Vibration", vibration, 5, "darkgreen", (2, 4), 2.5)
+        st.plotly_chart(fig_vib, use_container_width=True, config=PLOTLY_CONFIG)
+
+    # Prediction section
+    st.markdown("---")
+
+    # Center the prediction button
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col2:
+        predict_button = st.form_submit_button("🔮 Predict Maintenance Priority", use_container_width=True)
+
+# Analysis dashboard: metrics, radar and parameter summary for one prediction
+def render_dashboard(prediction, confidence, normalized_values,
+                     temp, vibration, pressure, inspection, downtime, technician):
+    # Results dashboard
+    st.markdown("### 📊 Analysis Dashboard")
+    
+    col1, col2, col3 = st.columns(3)
     
-    with col_b:
-        inspection = st.number_input(
-            "🕒 Inspection Duration (min)",
-            min_value=1,
-            max_value=480,
-            value=30,
-            step=1,
-            help="Time spent on inspection"
+    with col1:
+        st.metric(
+            label="Priority Level",
+            value=prediction,
+            delta="Critical" if prediction == "High" else "Normal"
         )
-        
-        downtime = st.number_input(
-            "💰 Downtime Cost (USD)",
-            min_value=0,
-            max_value=100000,
-            value=1000,
-            step=50,
-            help="Cost per hour of downtime"
+    
+    with col2:
+        st.metric(
+            label="Confidence Score",
+            value=f"{confidence:.1f}%",
+            delta="High Confidence" if confidence > 80 else "Medium Confidence"
         )
-        
-        technician = st.number_input(
-            "👷 Technician Availability (%)",
-            min_value=0,
-            max_value=100,
-            value=85,
-            step=1,
-            help="Percentage of technician availability"
+    
+    with col3:
+        risk_score = 85 if str(prediction) == "High" else 55 if str(prediction) == "Medium" else 25
+        st.metric(
+            label="Risk Score",
+            value=f"{risk_score}/100",
+            delta="High Risk" if risk_score > 70 else "Low Risk"
         )
-
-with col2:
-    st.markdown("### 📈 Real-time Metrics")
     
-    # Create gauge charts for key metrics
-    fig_temp = go.Figure(go.Indicator(
-        mode = "gauge+number",
-        value = temp,
-        title = {'text': "Temperature"},
-        domain = {'x': [0, 1], 'y': [0, 1]},
-        gauge = {
-            'axis': {'range': [None, 100]},
-            'bar': {'color': "darkblue"},
-            'steps': [
-                {'range': [0, 50], 'color': "lightgray"},
-                {'range': [50, 80], 'color': "gray"}],
-            'threshold': {
-                'line': {'color': "red", 'width': 4},
-                'thickness': 0.75,
-                'value': 80}}
-    ))
-    fig_temp.update_layout(height=200, margin=dict(l=0, r=0, t=30, b=0))
-    st.plotly_chart(fig_temp, use_container_width=True)
+    # Detailed analysis
+    st.markdown("### 📋 Detailed Analysis")
     
-    fig_vib = go.Figure(go.Indicator(
-        mode = "gauge+number",
-        value = vibration,
-        title = {'text': "Vibration"},
-        domain = {'x': [0, 1], 'y': [0, 1]},
-        gauge = {
-            'axis': {'range': [None, 5]},
-            'bar': {'color': "darkgreen"},
-            'steps': [
-                {'range': [0, 2], 'color': "lightgray"},
-                {'range': [2, 4], 'color': "gray"}],
-            'threshold': {
-                'line': {'color': "red", 'width': 4},
-                'thickness': 0.75,
-                'value': 2.5}}
-    ))
-    fig_vib.update_layout(height=200, margin=dict(l=0, r=0, t=30, b=0))
-    st.plotly_chart(fig_vib, use_container_width=True)
-
-# Prediction section
-st.markdown("---")
-
-# Center the prediction button
-col1, col2, col3 = st.columns([1, 2, 1])
-with col2:
-    predict_button = st.button("🔮 Predict Maintenance Priority", use_container_width=True)
+    # Radar chart for parameter analysis
+    fig_radar = build_radar(normalized_values)
+    
+    st.plotly_chart(fig_radar, use_container_width=True, config=PLOTLY_CONFIG)
+    
+    # Parameter summary table
+    st.markdown("### 📈 Parameter Summary")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown(f"""
+        **🌡️ Temperature:** {temp}°C  
+        **🔊 Vibration:** {vibration} mm/s  
+        **⚙️ Pressure:** {pressure} bar  
+        """)
+    
+    with col2:
+        st.markdown(f"""
+        **🕒 Inspection:** {inspection} min  
+        **💰 Downtime Cost:** ${downtime:,.2f}  
+        **👷 Technician:** {technician}%  
+        """)
 
 if predict_button:
     with st.spinner("🤖 AI is analyzing your equipment data..."):
-        time.sleep(2)  # Simulate processing time
-        
-        input_data = np.array([[temp, vibration, pressure, inspection, downtime, technician]])
-        
         if MODEL_LOADED:
-            input_scaled = scaler.transform(input_data)
-            prediction_raw = model.predict(input_scaled)[0]
+            prediction_raw, confidence = run_predict(
+                float(temp), float(vibration), float(pressure),
+                float(inspection), float(downtime), float(technician)
+            )
             
             # Convert numeric prediction to text
             if isinstance(prediction_raw, (int, np.integer)):
@@ -334,117 +585,27 @@ if predict_button:
                 prediction = prediction_map.get(prediction_raw, 'Medium')
             else:
                 prediction = str(prediction_raw)
-            
-            # Get prediction probabilities if available
-            try:
-                probabilities = model.predict_proba(input_scaled)[0]
-                confidence = max(probabilities) * 100
-            except:
-                confidence = 85  # Default confidence
         else:
-            prediction = np.random.choice(['Low', 'Medium', 'High'])
+            prediction = random.choice(_LABELS)
             confidence = 75  # Demo confidence
         
         # Display prediction with styled card
         priority_class = str(prediction).lower()
         
-        recommendations = {
-            'High': 'Immediate action required',
-            'Medium': 'Schedule maintenance',
-            'Low': 'Monitor regularly'
-        }
-        
-        st.markdown(f"""
-        <div class="prediction-card {priority_class}">
-            <h2>🎯 Maintenance Priority: {prediction}</h2>
-            <p style="font-size: 1.2rem; margin: 1rem 0;">Confidence: {confidence:.1f}%</p>
-            <p style="font-size: 1rem;">Recommendation: {recommendations.get(prediction, 'Monitor regularly')}</p>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        # Results dashboard
-        st.markdown("### 📊 Analysis Dashboard")
-        
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            st.metric(
-                label="Priority Level",
-                value=prediction,
-                delta="Critical" if prediction == "High" else "Normal"
-            )
-        
-        with col2:
-            st.metric(
-                label="Confidence Score",
-                value=f"{confidence:.1f}%",
-                delta="High Confidence" if confidence > 80 else "Medium Confidence"
-            )
-        
-        with col3:
-            risk_score = 85 if str(prediction) == "High" else 55 if str(prediction) == "Medium" else 25
-            st.metric(
-                label="Risk Score",
-                value=f"{risk_score}/100",
-                delta="High Risk" if risk_score > 70 else "Low Risk"
-            )
-        
-        # Detailed analysis
-        st.markdown("### 📋 Detailed Analysis")
-        
-        # Create a radar chart for parameter analysis
-        categories = ['Temperature', 'Vibration', 'Pressure', 'Inspection', 'Downtime', 'Technician']
-        
-        # Normalize values to 0-1 scale for radar chart
-        normalized_values = [
-            min(temp/100, 1.0),
-            min(vibration/5, 1.0), 
-            min(pressure/20, 1.0),
-            min(inspection/60, 1.0),
-            min(downtime/5000, 1.0),
-            min(technician/100, 1.0)
-        ]
-        
-        fig_radar = go.Figure()
-        fig_radar.add_trace(go.Scatterpolar(
-            r=normalized_values,
-            theta=categories,
-            fill='toself',
-            name='Current Values',
-            line_color='#667eea'
-        ))
+        st.markdown(_PRED_CARD.format(
+            cls=priority_class,
+            pred=prediction,
+            conf=confidence,
+            rec=RECOMMENDATIONS.get(prediction, 'Monitor regularly')
+        ), unsafe_allow_html=True)
         
-        fig_radar.update_layout(
-            polar=dict(
-                radialaxis=dict(
-                    visible=True,
-                    range=[0, 1]
-                )),
-            showlegend=True,
-            title="Parameter Analysis",
-            height=400
+        normalized_values = normalize_for_radar(
+            float(temp), float(vibration), float(pressure),
+            float(inspection), float(downtime), float(technician)
         )
         
-        st.plotly_chart(fig_radar, use_container_width=True)
-        
-        # Parameter summary table
-        st.markdown("### 📈 Parameter Summary")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.markdown(f"""
-            **🌡️ Temperature:** {temp}°C  
-            **🔊 Vibration:** {vibration} mm/s  
-            **⚙️ Pressure:** {pressure} bar  
-            """)
-        
-        with col2:
-            st.markdown(f"""
-            **🕒 Inspection:** {inspection} min  
-            **💰 Downtime Cost:** ${downtime:,.2f}  
-            **👷 Technician:** {technician}%  
-            """)
+        render_dashboard(prediction, confidence, normalized_values,
+                         temp, vibration, pressure, inspection, downtime, technician)
 
 # Footer
 st.markdown("---")
@@ -1,18 +1,32 @@
 import streamlit as st
 import numpy as np
-import pickle
+import joblib
+import random
+
+# StandardScaler as float32 (mu, inv_scale); None means use scaler.transform
+def get_scale_params(scaler):
+    from sklearn.preprocessing import StandardScaler
+    
+    if not isinstance(scaler, StandardScaler):
+        return None
+    mu = scaler.mean_ if scaler.with_mean else 0.0
+    scale = scaler.scale_ if scaler.with_std else 1.0
+    mu = np.asarray(mu, dtype=np.float32)
+    inv_scale = (1.0 / np.asarray(scale, dtype=np.float64)).astype(np.float32)
+    return mu, inv_scale
 
 # Load model and scaler
 try:
-    with open("model.pkl", "rb") as f:
-        model = pickle.load(f)
-    with open("scaler.pkl", "rb") as f:
-        scaler = pickle.load(f)
+    model = joblib.load("model.pkl")
+    scaler = joblib.load("scaler.pkl")
+    scale_params = get_scale_params(scaler)
     MODEL_LOADED = True
 except Exception as e:
     MODEL_LOADED = False
     st.warning("⚠️ Running in Demo Mode (Model not loaded)")
 
+_LABELS = ('Low', 'Medium', 'High')
+
 # Streamlit app UI
 st.set_page_config(page_title="Smart Maintenance Priority", page_icon="🔧", layout="centered")
 
@@ -20,40 +34,39 @@ st.title("🔧 Smart Maintenance Priority Prediction")
 st.markdown("Enter the machine inspection data to predict maintenance priority.")
 
 # Input fields
-temp = st.text_input("🌡️ Temperature (°C)", "e.g., 75")
-vibration = st.text_input("🔊 Vibration (mm/s)", "e.g., 1.5")
-pressure = st.text_input("⚙️ Pressure (bar)", "e.g., 5.0")
-inspection = st.text_input("🕒 Inspection Duration (min)", "e.g., 30")
-downtime = st.text_input("💰 Downtime Cost (USD)", "e.g., 1000")
-technician = st.text_input("👷 Technician Availability (%)", "e.g., 85")
+temp = st.number_input("🌡️ Temperature (°C)", value=75.0, step=0.1, format="%.2f")
+vibration = st.number_input("🔊 Vibration (mm/s)", value=1.5, step=0.1, format="%.2f")
+pressure = st.number_input("⚙️ Pressure (bar)", value=5.0, step=0.1, format="%.2f")
+inspection = st.number_input("🕒 Inspection Duration (min)", value=30.0, step=1.0, format="%.2f")
+downtime = st.number_input("💰 Downtime Cost (USD)", value=1000.0, step=50.0, format="%.2f")
+technician = st.number_input("👷 Technician Availability (%)", value=85.0, step=1.0, format="%.2f")
 
 # Predict button
 if st.button("🔮 Predict Maintenance Priority"):
     try:
-        inputs = [temp, vibration, pressure, inspection, downtime, technician]
-        if any(i.strip().startswith("e.g.") or i.strip() == "" for i in inputs):
-            st.error("❗ Please fill in all the input fields correctly.")
-        else:
-            input_data = np.array([[float(temp), float(vibration), float(pressure),
-                                    float(inspection), float(downtime), float(technician)]])
-            
-            if MODEL_LOADED:
-                input_scaled = scaler.transform(input_data)
-                prediction = model.predict(input_scaled)[0]
+        input_data = np.array([[temp, vibration, pressure, inspection, downtime, technician]], dtype=np.float32)
+        
+        if MODEL_LOADED:
+            if scale_params is not None:
+                mu, inv_scale = scale_params
+                input_scaled = (input_data - mu) * inv_scale
             else:
-                prediction = np.random.choice(['Low', 'Medium', 'High'])
-
-            st.success(f"🎯 Predicted Maintenance Priority: **{prediction}**")
-
-            # Show input summary
-            st.subheader("📋 Input Summary")
-            st.markdown(f"""
-            - Temperature: {temp} °C  
-            - Vibration: {vibration} mm/s  
-            - Pressure: {pressure} bar  
-            - Inspection Duration: {inspection} min  
-            - Downtime Cost: ${downtime}  
-            - Technician Availability: {technician}%
-            """)
+                input_scaled = scaler.transform(input_data)
+            prediction = model.predict(input_scaled)[0]
+        else:
+            prediction = random.choice(_LABELS)
+
+        st.success(f"🎯 Predicted Maintenance Priority: **{prediction}**")
+
+        # Show input summary
+        st.subheader("📋 Input Summary")
+        st.markdown(f"""
+        - Temperature: {temp} °C  
+        - Vibration: {vibration} mm/s  
+        - Pressure: {pressure} bar  
+        - Inspection Duration: {inspection} min  
+        - Downtime Cost: ${downtime}  
+        - Technician Availability: {technician}%
+        """)
     except Exception as e:
         st.error(f"An error occurred: {e}")